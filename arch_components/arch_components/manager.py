@@ -4,10 +4,11 @@ from typing import List, Union
 
 import rclpy
 from rclpy.node import Node, Service
+from rclpy.qos import HistoryPolicy, QoSProfile, ReliabilityPolicy
 from rclpy.client import Future
 from rclpy.action import ActionClient
 
-from arch_interfaces.msg import AssignedGoal, Position, AgentPaths
+from arch_interfaces.msg import AssignedGoal, Position, PositionArray, AgentPaths
 from arch_interfaces.srv import AgentRequest
 from arch_interfaces.action import PlanRequest
 
@@ -62,11 +63,20 @@ class Manager(Node):
         )
 
         # Subscription for goal updates
+        # BEST_EFFORT to match the goal publishers and skip ack handshakes
         self.goal_subscription = self.create_subscription(
             Position,
             'goals',
             self.goal_callback,
-            10
+            QoSProfile(depth=10, reliability=ReliabilityPolicy.BEST_EFFORT, history=HistoryPolicy.KEEP_LAST)
+        )
+
+        # Subscription for batched goal updates
+        self.goal_batch_subscription = self.create_subscription(
+            PositionArray,
+            'goals_batch',
+            self.goal_batch_callback,
+            QoSProfile(depth=10, reliability=ReliabilityPolicy.BEST_EFFORT, history=HistoryPolicy.KEEP_LAST)
         )
 
         # Plan publisher for agents
@@ -112,6 +122,24 @@ class Manager(Node):
 
         self.call_planner_async()
 
+    def goal_batch_callback(self, msg: PositionArray) -> None:
+        """
+        Add a batch of published goals to the manager, Trigger at most one plan callback
+        """
+        listed = False
+        for goal in msg.positions:
+            if goal in self.unassigned_goals:
+                continue
+            self.unassigned_goals.append(goal)
+            self.get_logger().info(f"GOAL LISTED: {goal}")
+            listed = True
+
+        # Trigger a single call if there are agents and at least one new goal
+        if not listed or len(self.unassigned_agents) == 0:
+            return
+
+        self.call_planner_async()
+
     def action_failed_agent_handler(self,
         agent_id: str,
         response: AgentRequest.Response
@@ -1,6 +1,6 @@
 
 import rclpy
-from .utils import *
+from .utils import AgentDummyExecutor, GoalPublisher, SingleThreadNodePool
 
 from arch_components.planner import Planner
 from arch_components.manager import Manager
@@ -1,111 +1,145 @@
-
-from time import sleep
-from typing import Tuple
-from threading import Thread
+"""
+Manager integration tests.
+
+All nodes in every test live in a single process and share one rclpy context
+(see setup_module), so message exchange never leaves the host. rclpy offers no
+intra-process comms switch (that is an rclcpp-only NodeOptions flag), so the
+transport is whatever RMW is configured; for the lowest-latency runs export
+RMW_IMPLEMENTATION=rmw_cyclonedds_cpp before invoking the tests.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
 import rclpy
 from geometry_msgs.msg import Vector3
 
 from arch_components.planner import Planner, PlannerResponseTypes
 from arch_components.manager import Manager, ManagerRequestTypes, ManagerResponseTypes
 from arch_interfaces.msg import Position
-from mock import MagicMock
 
-from .utils import FixedFrameBroadcaster, GoalPublisher, ManagerTestClient, SingleThreadNodePool
+from .utils import FixedFrameBroadcaster, GoalPublisher, ManagerTestClient, SingleThreadNodePool, wait_until
 
-def test_transform_broadcast():
+# Shared rclpy context & executor - standing up a fresh DDS participant per test
+# costs seconds of discovery, so init/shutdown happen once for the whole module.
+# The executor has no spin thread of its own: tests drive it inline through
+# wait_until(..., executor=_executor), avoiding context switches per callback.
+_executor = None
+
+def setup_module(module=None):
+    global _executor
     rclpy.init()
-    arena_broadcaster = FixedFrameBroadcaster("world", "arena", Vector3(x=0.0, y=0.0, z=0.0), 0.01)
+    _executor = rclpy.executors.SingleThreadedExecutor()
+
+def teardown_module(module=None):
+    _executor.shutdown()
+    rclpy.shutdown()
+
+def destroy_nodes(*nodes):
+    for node in nodes:
+        _executor.remove_node(node)
+        node.destroy_node()
+
+def test_transform_broadcast():
+    arena_broadcaster = FixedFrameBroadcaster("world", "arena", Vector3(x=0.0, y=0.0, z=0.0), 0.05)
     planner = Planner()
 
-    executor = rclpy.executors.MultiThreadedExecutor()
-    executor.add_node(arena_broadcaster)
-    executor.add_node(planner)
-    executor_thread = Thread(target=executor.spin, daemon=True)
-    executor_thread.start()
-    sleep(0.5)
-    frame_ids = planner.get_all_frame_ids()
-    assert "arena" in frame_ids and len(frame_ids) == 1
+    _executor.add_node(arena_broadcaster)
+    _executor.add_node(planner)
+    wait_until(lambda: "arena" in planner.get_all_frame_ids(), executor=_executor)
+    assert len(planner.get_all_frame_ids()) == 1
 
-    executor.shutdown()
-    rclpy.shutdown()
-    executor_thread.join()
+    destroy_nodes(arena_broadcaster, planner)
 
 def test_agent_requests():
-    rclpy.init()
     planner = Planner()
     manager = Manager()
-    
-    executor = rclpy.executors.MultiThreadedExecutor()
-    executor.add_node(planner)
-    executor_thread = Thread(target=executor.spin, daemon=True)
-    executor_thread.start()
-
-    req_mock = MagicMock()
-    req_mock.agent_msg = ManagerRequestTypes.IDLE
-    req_mock.agent_id = "agent_1"
-    
+
+    _executor.add_node(planner)
+
+    # agent_callback only reads/writes attributes, so plain namespaces are
+    # enough (and far cheaper to build than MagicMocks)
+    req_mock = SimpleNamespace(agent_msg=ManagerRequestTypes.IDLE, agent_id="agent_1")
+    response_mock = SimpleNamespace()
+
     # Check if agent is actually listed
-    manager.agent_callback(req_mock, MagicMock())
+    manager.agent_callback(req_mock, response_mock)
 
     assert manager.unassigned_agents == ["agent_1"]
     # Try to disconnect an agent ( should succeed )
     req_mock.agent_msg = ManagerRequestTypes.AGENT_DISCONNECTED
-    response_mock = MagicMock()
     manager.agent_callback(req_mock, response_mock)
 
     assert manager.unassigned_agents == []
-    sleep(0.5)
 
-    executor.shutdown()
-    rclpy.shutdown()
-    executor_thread.join()
+    destroy_nodes(planner)
+    manager.destroy_node()
 
 def test_goal_input():
-    rclpy.init()
     planner = Planner()
     manager = Manager()
     goal_publisher = GoalPublisher()
 
-    executor = rclpy.executors.MultiThreadedExecutor()
-    executor.add_node(planner)
-    executor.add_node(goal_publisher)
+    _executor.add_node(planner)
+    _executor.add_node(goal_publisher)
     thread_pool = SingleThreadNodePool()
     thread_pool.add_nodes(manager)
-
-    executor_thread = Thread(target=executor.spin, daemon=True)
     thread_pool.start()
-    executor_thread.start()
 
     goal_1 = Position(x=50.0, y=50.0, w=1.0)
     goal_publisher.publish_goal(goal_1)
-    while manager.unassigned_goals != [goal_1]:
-        sleep(0.1)
-    
+    wait_until(lambda: manager.unassigned_goals == [goal_1], executor=_executor)
+
     thread_pool.stop()
-    executor.shutdown()
-    rclpy.shutdown()
-    executor_thread.join()
+    destroy_nodes(planner, goal_publisher)
+    manager.destroy_node()
+
+def test_goal_batch_input():
+    planner = Planner()
+    manager = Manager()
+    goal_publisher = GoalPublisher()
+
+    _executor.add_node(planner)
+    _executor.add_node(goal_publisher)
+    thread_pool = SingleThreadNodePool()
+    thread_pool.add_nodes(manager)
+    thread_pool.start()
+
+    goal_1 = Position(x=50.0, y=50.0, w=1.0)
+    goal_2 = Position(x=150.0, y=150.0, w=1.0)
+    # The duplicated goal must be listed only once
+    goal_publisher.publish_goals([goal_1, goal_2, goal_1])
+    wait_until(lambda: len(manager.unassigned_goals) == 2, executor=_executor)
+    assert manager.unassigned_goals == [goal_1, goal_2]
+
+    thread_pool.stop()
+    destroy_nodes(planner, goal_publisher)
+    manager.destroy_node()
 
 def test_manager_live_request():
-    rclpy.init()
     planner = Planner()
     manager = Manager()
     goal_publisher = GoalPublisher()
     client = ManagerTestClient()
     thread_pool = SingleThreadNodePool()
 
-    executor = rclpy.executors.MultiThreadedExecutor()
-    executor.add_node(planner)
-    executor_thread = Thread(target=executor.spin, daemon=True)
+    _executor.add_node(planner)
     thread_pool.add_nodes(manager, goal_publisher, client)
-
-    executor_thread.start()
     thread_pool.start()
 
     goal_publisher.publish_goal(Position(x=50.0, y=50.0, w=1.0))
     client.create_request(ManagerRequestTypes.IDLE, "agent_1")
 
-    sleep(0.5)
+    # Agents clearing is the last statement of plan_done_callback, so it is
+    # the signal that the plan result was fully processed
+    wait_until(
+        lambda: client.response.done()
+        and manager.future_response is not None
+        and manager.future_response.done()
+        and not manager.unassigned_agents,
+        executor=_executor
+    )
     # A plan request should've triggered & also fail because no transforms are published
     # Agents are wiped on plan results, Goals are not
     assert len(manager.unassigned_agents) == 0
@@ -114,40 +148,67 @@ def test_manager_live_request():
     assert manager.future_response.result().result.error_msg == PlannerResponseTypes.TRANSFORM_FAILURE
 
     # Add tf publishings
-    arena_broadcaster = FixedFrameBroadcaster("world", "arena", Vector3(x=0.0, y=0.0, z=0.0), 0.01)
-    agent_1_broadcaster = FixedFrameBroadcaster("arena", "agent_1", Vector3(x=500.0, y=500.0, z=0.0), 0.01)
+    arena_broadcaster = FixedFrameBroadcaster("world", "arena", Vector3(x=0.0, y=0.0, z=0.0), 0.05)
+    agent_1_broadcaster = FixedFrameBroadcaster("arena", "agent_1", Vector3(x=500.0, y=500.0, z=0.0), 0.05)
 
     thread_pool.add_nodes_after_start(arena_broadcaster, agent_1_broadcaster)
-    sleep(0.5)
+    wait_until(lambda: {"arena", "agent_1"} <= set(planner.get_all_frame_ids()), executor=_executor)
     client.create_request(ManagerRequestTypes.IDLE, "agent_1")
-    sleep(0.5)
-    
-    # Wait for future response to be ready
-    while not manager.future_response.done():
-        sleep(0.1)
-    
+
+    # Wait for the plan result to be fully processed by the manager - agents
+    # are cleared last in plan_done_callback
+    wait_until(
+        lambda: len(manager.assigned_goals) == 1 and not manager.unassigned_agents,
+        timeout=5.0,
+        executor=_executor
+    )
+
     # Check that indeed the goal & agent were assigned together
     assert len(manager.assigned_goals) == 1
     assert manager.unassigned_goals == []
     assert manager.unassigned_agents == []
 
     thread_pool.stop()
-    executor.shutdown()
-    rclpy.shutdown()
-    executor_thread.join()
+    destroy_nodes(planner)
+    for node in (manager, goal_publisher, client, arena_broadcaster, agent_1_broadcaster):
+        node.destroy_node()
+
+def run_test_in_process(test_name: str, domain_id: int):
+    """
+    Entry point for a spawned test process: isolate the DDS domain so the
+    concurrently-running tests cannot discover each other, then stand up the
+    module context, run the single test and tear everything down.
+    """
+    os.environ["ROS_DOMAIN_ID"] = str(domain_id)
+    setup_module()
+    try:
+        globals()[test_name]()
+    finally:
+        teardown_module()
 
 def main(args=None):
     tests = [
         test_transform_broadcast,
         test_agent_requests,
         test_goal_input,
+        test_goal_batch_input,
         test_manager_live_request
     ]
-    for test in tests:
-        print(f"Running test: {test.__qualname__}", end="")
-        test()
-        print(" - Success")
-        
+    # The tests share no state, so each runs in its own spawned process on its
+    # own DDS domain - participant discovery happens concurrently instead of
+    # serially
+    base_domain = int(os.environ.get("ROS_DOMAIN_ID", "0"))
+    spawn_ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(tests), mp_context=spawn_ctx) as pool:
+        futures = [
+            (test, pool.submit(run_test_in_process, test.__name__, base_domain + i + 1))
+            for i, test in enumerate(tests)
+        ]
+        for test, future in futures:
+            print(f"Running test: {test.__qualname__}", end="")
+            future.result()
+            print(" - Success")
+
 
 if __name__ == '__main__':
     main()
@@ -1,78 +1,137 @@
 
-from threading import Thread
-from time import sleep
+import io
+from threading import Event, Thread
+from time import monotonic
 
-from attr import s
 import rclpy
-from typing import List, Tuple
+from typing import Callable, List, Tuple
+from rclpy.logging import LoggingSeverity
 from rclpy.node import Node
+from rclpy.qos import HistoryPolicy, QoSProfile, ReliabilityPolicy
 from tf2_ros import TransformStamped, TransformBroadcaster
 from geometry_msgs.msg import Vector3
-from arch_components.planner import Planner, PlannerResponseTypes
-from arch_components.manager import Manager, ManagerRequestTypes, ManagerResponseTypes
-from arch_interfaces.msg import Position, AgentPaths, AssignedPath
+from arch_components.manager import ManagerRequestTypes, ManagerResponseTypes
+from arch_interfaces.msg import Position, PositionArray, AgentPaths, AssignedPath
 from arch_interfaces.srv import AgentRequest
 
+def _index(msg: AgentPaths) -> dict:
+    """
+    Index an AgentPaths message by agent_id, turning the per-agent path
+    lookup into O(1) instead of a scan over every assigned path.
+    """
+    return {path.agent_id: path for path in msg.agent_paths}
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 2.0, poll: float = 0.005, executor=None) -> None:
+    """
+    Block until predicate() is truthy, re-checking every `poll` seconds.
+    If an executor is given it is driven inline via spin_once between checks,
+    so no dedicated spin thread is needed. Raises TimeoutError if the
+    predicate stays falsy for `timeout` seconds.
+    """
+    deadline = monotonic() + timeout
+    event = Event()
+    while not predicate():
+        if monotonic() > deadline:
+            raise TimeoutError(f"Condition not met within {timeout} seconds")
+        if executor is not None:
+            executor.spin_once(timeout_sec=poll)
+        else:
+            event.wait(poll)
+
 class TestFrameBroadcaster(Node):
     def __init__(self):
         super().__init__('test_frame_broadcaster')
         self.br = TransformBroadcaster(self)
+        self._clock = self.get_clock()
+
+        # Pre-filled arena transform - only the stamp changes per broadcast
+        self._arena_t = TransformStamped()
+        self._arena_t.header.frame_id = 'world'
+        self._arena_t.child_frame_id = 'arena'
+        self._arena_t.transform.translation.x = 1.0
+        self._arena_t.transform.translation.y = 1.0
+        self._arena_t.transform.translation.z = 1.0
+
+        # Lazily cached per-agent transform templates
+        self._templates = {}
 
     def broadcast_arena(self):
-        t = TransformStamped()
-        t.header.stamp = self.get_clock().now().to_msg()
-        t.header.frame_id = 'world'
-        t.child_frame_id = 'arena'
-        t.transform.translation.x = 1.0
-        t.transform.translation.y = 1.0
-        t.transform.translation.z = 1.0
-        self.br.sendTransform(t)
-    
+        self._arena_t.header.stamp = self._clock.now().to_msg()
+        self.br.sendTransform(self._arena_t)
+
     def broadcast_agent(self, agent_id: str, loc: Tuple[float, float, float]):
-        t = TransformStamped()
-        t.header.stamp = self.get_clock().now().to_msg()
-        t.header.frame_id = 'arena'
-        t.child_frame_id = agent_id
+        t = self._templates.get(agent_id)
+        if t is None:
+            t = TransformStamped()
+            t.header.frame_id = 'arena'
+            t.child_frame_id = agent_id
+            self._templates[agent_id] = t
+        t.header.stamp = self._clock.now().to_msg()
         t.transform.translation.x = loc[0]
         t.transform.translation.y = loc[1]
         t.transform.translation.z = loc[2]
         self.br.sendTransform(t)
 
 class FixedFrameBroadcaster(Node):
-    def __init__(self, parent_frame_id: str, child_frame_id: str, pos: Vector3, freq: rclpy.time.Time = 0.00833):
+    def __init__(self, parent_frame_id: str, child_frame_id: str, pos: Vector3, freq: float = 0.05, one_shot: bool = False):
         super().__init__(f'FF_{child_frame_id}_broadcaster')
-        self.parent_id = parent_frame_id
-        self.child_id = child_frame_id
-        self.pos = pos
         self.br = TransformBroadcaster(self)
+        self.one_shot = one_shot
+        self._clock = self.get_clock()
+
+        # The transform is fixed - pre-fill it once, only the stamp changes per tick
+        self._t = TransformStamped()
+        self._t.header.frame_id = parent_frame_id
+        self._t.child_frame_id = child_frame_id
+        self._t.transform.translation.x = pos.x
+        self._t.transform.translation.y = pos.y
+        self._t.transform.translation.z = pos.z
+
         self.timer = self.create_timer(freq, self.broadcast_timer_callback)
-    
-    def broadcast_timer_callback(self):
-        t = TransformStamped()
-        t.header.stamp = self.get_clock().now().to_msg()
-        t.header.frame_id = self.parent_id
-        t.child_frame_id = self.child_id
-        t.transform.translation.x = self.pos.x
-        t.transform.translation.y = self.pos.y
-        t.transform.translation.z = self.pos.z
 
-        self.br.sendTransform(t)
+    def broadcast_timer_callback(self):
+        self._t.header.stamp = self._clock.now().to_msg()
+        self.br.sendTransform(self._t)
+        if self.one_shot:
+            self.timer.cancel()
 
 class GoalPublisher(Node):
     def __init__(self):
         super().__init__("goal_publisher")
-        self.publisher = self.create_publisher(Position, "goals", 10)
-    
+        # BEST_EFFORT skips the reliability ack handshake; must match the
+        # manager's subscription QoS
+        self.publisher = self.create_publisher(
+            Position,
+            "goals",
+            QoSProfile(depth=10, reliability=ReliabilityPolicy.BEST_EFFORT, history=HistoryPolicy.KEEP_LAST),
+        )
+        self.batch_publisher = self.create_publisher(
+            PositionArray,
+            "goals_batch",
+            QoSProfile(depth=10, reliability=ReliabilityPolicy.BEST_EFFORT, history=HistoryPolicy.KEEP_LAST),
+        )
+
     def publish_goal(self, goal: Position) -> None:
         self.publisher.publish(goal)
 
+    def publish_goals(self, goals: List[Position]) -> None:
+        """
+        Publish many goals as one message, amortizing the per-message
+        serialization/waitset cost in stress tests.
+        """
+        self.batch_publisher.publish(PositionArray(positions=goals))
+
 class ManagerTestClient(Node):
     def __init__(self):
         super().__init__('manager_client')
         self.cli = self.create_client(AgentRequest, 'agent_request')
-    
+        # Reused across requests - only the two fields change per call
+        self._req = AgentRequest.Request()
+
     def create_request(self, agent_msg: str, agent_id: str):
-        self.response = self.cli.call_async(AgentRequest.Request(agent_msg=agent_msg, agent_id=agent_id))
+        self._req.agent_msg = agent_msg
+        self._req.agent_id = agent_id
+        self.response = self.cli.call_async(self._req)
 
 class AgentTestExecutor(Node):
     def __init__(self, agent_id: str):
@@ -80,34 +139,78 @@ class AgentTestExecutor(Node):
         self.agent_id = agent_id
         self.cli = self.create_client(AgentRequest, 'agent_request')
         self.subscription = self.create_subscription(AgentPaths, 'agent_paths', self.sol_callback, 10)
-    
-    def request_and_wait_for_response(self, agent_msg: str = ManagerRequestTypes.IDLE):
+        # Reused across requests - only agent_msg changes per call
+        self._req = AgentRequest.Request(agent_id=agent_id)
+        # Cached logger reference - sol_callback runs per message
+        self._log = self.get_logger()
+
+
+    def request_and_wait_for_response(self, agent_msg: str = ManagerRequestTypes.IDLE, timeout: float = 10.0):
         """
         This method is not asynchronous in the sense that if you call this from the main thread,
-        it will block the main thread (Unlike sol_callback which is called on the dedicated thread for the node). 
+        it will block the main thread (Unlike sol_callback which is called on the dedicated thread for the node).
         Please be wary of that.
         """
-        while not self.cli.service_is_ready():
-            sleep(0.1)
-        response = self.cli.call(AgentRequest.Request(agent_msg=agent_msg, agent_id=self.agent_id))
-        while response.error_msg == ManagerResponseTypes.RETRY:
-            sleep_time = float(response.args[0])
-            sleep(sleep_time)
-            response = self.cli.call(AgentRequest.Request(agent_msg=agent_msg, agent_id=self.agent_id))
+        if not self.cli.wait_for_service(timeout_sec=5.0):
+            raise TimeoutError("agent_request service not available after 5 seconds")
+
+        done = Event()
+        final_future = []
+
+        def send_request() -> None:
+            self._req.agent_msg = agent_msg
+            future = self.cli.call_async(self._req)
+            future.add_done_callback(on_response)
+
+        def on_response(future) -> None:
+            # A failed call (or a malformed RETRY with no delay arg) must wake
+            # the caller rather than be swallowed by the spinning executor
+            if future.exception() is None:
+                response = future.result()
+                if response.error_msg == ManagerResponseTypes.RETRY and response.args:
+                    # Retry after the delay the manager asked for - a one-shot
+                    # timer on the node's executor, so no thread ever sleeps
+                    retry_delay = float(response.args[0])
+
+                    def retry_callback() -> None:
+                        self.destroy_timer(retry_timer)
+                        send_request()
+
+                    retry_timer = self.create_timer(retry_delay, retry_callback)
+                    return
+            final_future.append(future)
+            done.set()
+
+        send_request()
+        if not done.wait(timeout=timeout):
+            raise TimeoutError(f"No agent_request response within {timeout} seconds")
+        exception = final_future[0].exception()
+        if exception is not None:
+            raise exception
     
     def disconect_and_reconnect(self):
         self.request_and_wait_for_response(ManagerRequestTypes.AGENT_DISCONNECTED)
         self.request_and_wait_for_response()
         
     def sol_callback(self, msg: AgentPaths):
-        agent_paths: List[AssignedPath] = msg.agent_paths
-        for assigned_path in agent_paths:
-            if assigned_path.agent_id == self.agent_id:
-                string_solution = '-->'.join([str((point.translation.x, point.translation.z)) for point in assigned_path.path])
-                self.get_logger().info(f"PATH PUBLISHED FOR {self.agent_id}: {string_solution}")
-                return
-        
-        self.get_logger().info(f"NO PATH PUBLISHED FOR {self.agent_id}")
+        # The formatted path only feeds the logger - skip the work entirely
+        # when INFO messages are filtered out
+        if self._log.get_effective_level() > LoggingSeverity.INFO:
+            return
+        assigned_path = _index(msg).get(self.agent_id)
+        if assigned_path is None:
+            self._log.info(f"NO PATH PUBLISHED FOR {self.agent_id}")
+            return
+        # Write-loop into a StringIO instead of building an intermediate list
+        # for join - one buffer write per point
+        buf = io.StringIO()
+        first = True
+        for point in assigned_path.path:
+            if not first:
+                buf.write('-->')
+            buf.write(f"({point.translation.x}, {point.translation.z})")
+            first = False
+        self._log.info(f"PATH PUBLISHED FOR {self.agent_id}: {buf.getvalue()}")
 
 class AgentDummyExecutor(Node):
     def __init__(self):
@@ -116,9 +219,8 @@ class AgentDummyExecutor(Node):
         self.subscription = self.create_subscription(AgentPaths, 'agent_paths', self.sol_callback, 10)
     
     def send_cli_request(self, agent_id: str, request_type: ManagerRequestTypes) -> None:
-        while not self.cli.service_is_ready():
-            self.get_logger().info("Manager Service not ready.")
-            sleep(0.1)
+        if not self.cli.wait_for_service(timeout_sec=5.0):
+            raise TimeoutError("agent_request service not available after 5 seconds")
         self.cli.call_async(AgentRequest.Request(agent_msg=request_type, agent_id=agent_id))
     
     def sol_callback(self, msg: AgentPaths):